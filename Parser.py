@@ -5,6 +5,7 @@ Features:
  - Queue view with per-item status
  - Console window (logs)
  - Multithreaded downloads using QThreadPool (configurable workers)
+ - Optional subprocess mode: one `python -m yt_dlp` QProcess per download
  - Check / install yt-dlp from GUI
  - Reset (clear queue, clear logs) and optional deletion of downloaded files from current session
  - Theming (light/dark/blue)
@@ -17,12 +18,15 @@ Save this file and run:
 
 """
 
+import logging
 import os
 import re
 import sys
-import traceback
+import threading
+import time
 import shutil
 from functools import partial
+from logging.handlers import RotatingFileHandler
 from pathlib import Path
 
 from PyQt5.QtCore import (
@@ -33,6 +37,9 @@ from PyQt5.QtCore import (
     pyqtSlot,
     QThreadPool,
     QProcess,
+    QProcessEnvironment,
+    QTimer,
+    QRect,
 )
 from PyQt5.QtGui import QFont
 from PyQt5.QtWidgets import (
@@ -44,7 +51,6 @@ from PyQt5.QtWidgets import (
     QTextEdit,
     QPlainTextEdit,
     QListWidget,
-    QListWidgetItem,
     QPushButton,
     QHBoxLayout,
     QVBoxLayout,
@@ -56,6 +62,10 @@ from PyQt5.QtWidgets import (
     QComboBox,
     QFileDialog,
     QStyleFactory,
+    QStyledItemDelegate,
+    QStyleOptionViewItem,
+    QStyleOptionProgressBar,
+    QStyle,
 )
 
 # Try import yt_dlp but don't crash the app if it's missing
@@ -68,103 +78,362 @@ except Exception:
 
 
 APP_NAME = "MDGT-RUTUBE-SAVER"
+# Full tracebacks go to a rotating log file, the console only gets a one-line summary
+# Kept next to the script (or the .exe in a frozen build), not in the current working directory
+LOG_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(sys.executable if getattr(sys, 'frozen', False) else __file__)),
+    'mdgt-rutube-saver.log',
+)
+# In a frozen build (.exe) sys.executable is the app itself and can't run `-m yt_dlp`
+SUBPROCESS_MODE_AVAILABLE = not getattr(sys, 'frozen', False)
+log = logging.getLogger(APP_NAME)
+# Minimal interval between progress signals of one download (~5 Hz)
+PROGRESS_EMIT_INTERVAL = 0.2
+# Console messages are buffered and written to the widget in one go with this period (ms)
+CONSOLE_FLUSH_MS = 100
+# Console keeps only the last N lines
+CONSOLE_MAX_LINES = 2000
+# Queue item data roles: the item text is the url, progress/status are stored as plain values
+PROGRESS_ROLE = Qt.UserRole + 1  # int percent
+STATUS_ROLE = Qt.UserRole + 2  # status text
+PROGRESS_BAR_WIDTH = 160
+
+# Stylesheets for the theme combo box
+_THEMES = {
+    'Dark': """
+    QWidget { background: #1e1e1e; color: #e0e0e0; }
+    QPushButton { background: #3a3a3a; border-radius: 6px; padding: 8px; }
+    QLineEdit, QPlainTextEdit, QTextEdit { background: #2b2b2b; color: #e0e0e0; }
+    QListWidget { background: #212121; }
+    QProgressBar { background: #2b2b2b; }
+    """,
+    'Light': """
+    QWidget { background: #f7f7f7; color: #222; }
+    QPushButton { background: #e7e7e7; border-radius: 6px; padding: 8px; }
+    QLineEdit, QPlainTextEdit, QTextEdit { background: white; color: #111; }
+    QListWidget { background: white; }
+    QProgressBar { background: #f0f0f0; }
+    """,
+    'Blue': """
+    QWidget { background: qlineargradient(x1:0, y1:0, x2:1, y2:1, stop:0 #e6f0ff, stop:1 #eef6ff); color: #03396c; }
+    QPushButton { background: #8fbce6; border-radius: 6px; padding: 8px; }
+    QLineEdit, QPlainTextEdit, QTextEdit { background: white; color: #03396c; }
+    QListWidget { background: white; }
+    QProgressBar { background: #dfeffd; }
+    """,
+}
+# re.ASCII skips Unicode case folding; the non-ASCII whitespace that \s would match
+# without it is listed explicitly so links still stop at e.g. a non-breaking space
 RUTUBE_LINK_RE = re.compile(
-    r"https?://(?:www\.)?rutube\.ru/[^\s\"'>]+",
-    re.IGNORECASE
+    r"https?://(?:www\.)?rutube\.ru/"
+    r"[^\s\"'<>\x1c-\x1f\x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000]+",
+    re.IGNORECASE | re.ASCII
 )
+# Texts longer than this are scanned in a worker thread so the GUI stays responsive
+EXTRACT_ASYNC_THRESHOLD = 64 * 1024
+
+
+def _iter_rutube_links(text: str):
+    """Yield rutube links in order, running the regex only where the text has a '://'"""
+    # str.find is a fast C scan and '://' has no case, so it prefilters big pastes cheaply
+    find = text.find
+    match = RUTUBE_LINK_RE.match
+    pos = 0
+    while True:
+        hit = find('://', pos)
+        if hit < 0:
+            return
+        m = None
+        for off in (5, 4):  # 'https', 'http'
+            if hit >= off:
+                m = match(text, hit - off)
+                if m:
+                    break
+        if m:
+            yield m.group(0)
+            pos = m.end()
+        else:
+            pos = hit + 3
+
+
+def extract_rutube_links(text: str):
+    """Return unique rutube links from text, keeping the order of first appearance"""
+    seen = set()
+    out = []
+    add = seen.add
+    append = out.append
+    for link in _iter_rutube_links(text):
+        if link not in seen:
+            add(link)
+            append(link)
+    return out
 
 
 class Signals(QObject):
     append_console = pyqtSignal(str)
-    item_progress = pyqtSignal(str, int)  # url, progress percent
-    item_status = pyqtSignal(str, str)  # url, status text
-    item_finished = pyqtSignal(str, str)  # url, filepath
+    # url, progress (-1 = unchanged), status ('' = unchanged), filepath
+    # Plain str/int arguments: no Python dict conversion per cross-thread emit.
+    # Status 'completed' means the file has finished downloading and carries its filepath.
+    item_update = pyqtSignal(str, int, str, str)
     enable_ui = pyqtSignal(bool)
+    links_extracted = pyqtSignal(list)  # links found by ExtractWorker
+    files_deleted = pyqtSignal(int)  # number of files removed by DeleteWorker
+    worker_done = pyqtSignal(str, int)  # url, run id: DownloadWorker.run has returned
+
+
+class ExtractWorker(QRunnable):
+    """QRunnable that scans a large text for rutube links off the GUI thread"""
+
+    def __init__(self, text: str, signals: Signals):
+        super().__init__()
+        self.text = text
+        self.signals = signals
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            links = extract_rutube_links(self.text)
+        except Exception as e:
+            self.signals.append_console.emit(f"[extract error] {e}")
+            links = []
+        self.signals.links_extracted.emit(links)
+
+
+class DeleteWorker(QRunnable):
+    """QRunnable that deletes downloaded files so slow disks don't stall the GUI thread"""
+
+    def __init__(self, files: list, signals: Signals):
+        super().__init__()
+        self.files = files
+        self.signals = signals
+
+    @pyqtSlot()
+    def run(self):
+        removed = 0
+        for f in self.files:
+            try:
+                Path(f).unlink()
+                removed += 1
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                self.signals.append_console.emit(f'Ошибка при удалении {f}: {e}')
+        self.signals.files_deleted.emit(removed)
+
+
+class QueueItemDelegate(QStyledItemDelegate):
+    """Paints a queue row as the url followed by a small progress bar with the item status"""
+
+    def paint(self, painter, option, index):
+        bar_w = min(PROGRESS_BAR_WIDTH, option.rect.width() // 3)
+        text_opt = QStyleOptionViewItem(option)
+        text_opt.rect = option.rect.adjusted(0, 0, -bar_w, 0)
+        super().paint(painter, text_opt, index)
+
+        percent = index.data(PROGRESS_ROLE) or 0
+        status = index.data(STATUS_ROLE) or ''
+        bar = QStyleOptionProgressBar()
+        bar.rect = QRect(option.rect.right() - bar_w + 1, option.rect.top() + 2, bar_w - 2, option.rect.height() - 4)
+        bar.minimum = 0
+        bar.maximum = 100
+        bar.progress = percent
+        bar.text = f'{percent}%' if status == 'running' else status
+        bar.textVisible = True
+        bar.state = option.state
+        QApplication.style().drawControl(QStyle.CE_ProgressBar, bar, painter)
+
+
+class YDLLogger:
+    """yt-dlp logger that forwards messages into the GUI console"""
+
+    def __init__(self, signals):
+        # store reference to Signals instance so logger methods can emit to GUI
+        self.signals = signals
+
+    def debug(self, msg):
+        # yt_dlp prints a lot of debug, ignore most
+        pass
+
+    def info(self, msg):
+        try:
+            self.signals.append_console.emit(f"[yt-dlp] {msg}")
+        except Exception:
+            pass
+
+    def warning(self, msg):
+        try:
+            self.signals.append_console.emit(f"[WARNING] {msg}")
+        except Exception:
+            pass
+
+    def error(self, msg):
+        try:
+            self.signals.append_console.emit(f"[ERROR] {msg}")
+        except Exception:
+            pass
 
 
 class DownloadWorker(QRunnable):
     """QRunnable that downloads a single URL using yt_dlp and reports progress via signals"""
 
-    def __init__(self, url: str, out_dir: str, ydl_opts: dict, signals: Signals):
+    def __init__(self, url: str, ydl_opts: dict, signals: Signals, stop_event: threading.Event, run_id: int):
         super().__init__()
         self.url = url
-        self.out_dir = out_dir
-        self.ydl_opts = dict(ydl_opts)
+        # shared between all workers of one start, never mutated here
+        self.ydl_opts = ydl_opts
         self.signals = signals
+        self.stop_event = stop_event
+        self.run_id = run_id
+        # throttle state for _progress_hook
+        self._last_emit_ts = 0.0
+        self._last_pct = -1
+
+    def _progress_hook(self, d):
+        if self.stop_event.is_set():
+            # yt-dlp treats KeyboardInterrupt as user abort and stops the download
+            raise KeyboardInterrupt
+        try:
+            status = d.get('status')
+            if status == 'downloading':
+                total = d.get('total_bytes') or d.get('total_bytes_estimate') or 0
+                downloaded = d.get('downloaded_bytes', 0)
+                percent = 0
+                if total:
+                    percent = int(downloaded / total * 100)
+                # yt-dlp calls the hook many times per second: drop repeated and too frequent updates
+                now = time.monotonic()
+                if percent != self._last_pct and now - self._last_emit_ts > PROGRESS_EMIT_INTERVAL:
+                    self._last_pct = percent
+                    self._last_emit_ts = now
+                    self.signals.item_update.emit(self.url, percent, '', '')
+            elif status == 'finished':
+                filename = d.get('filename') or d.get('info_dict', {}).get('filepath')
+                self.signals.append_console.emit(f"[{self.url}] finished -> {filename}")
+                self.signals.item_update.emit(self.url, 100, 'completed', filename or '')
+            elif status == 'error':
+                self.signals.append_console.emit(f"[{self.url}] download error")
+        except Exception as e:
+            self.signals.append_console.emit(f"[hook error] {e}")
 
     @pyqtSlot()
     def run(self):
         try:
-            # embed progress hook
-            def progress_hook(d):
-                try:
-                    status = d.get('status')
-                    if status == 'downloading':
-                        total = d.get('total_bytes') or d.get('total_bytes_estimate') or 0
-                        downloaded = d.get('downloaded_bytes', 0)
-                        percent = 0
-                        if total:
-                            percent = int(downloaded / total * 100)
-                        text = d.get('eta')
-                        self.signals.item_progress.emit(self.url, percent)
-                        self.signals.append_console.emit(f"[{self.url}] downloading: {percent}% ETA={d.get('eta')}")
-                    elif status == 'finished':
-                        filename = d.get('filename') or d.get('info_dict', {}).get('filepath')
-                        self.signals.item_progress.emit(self.url, 100)
-                        self.signals.append_console.emit(f"[{self.url}] finished -> {filename}")
-                        self.signals.item_finished.emit(self.url, filename or '')
-                except Exception as e:
-                    self.signals.append_console.emit(f"[hook error] {e}")
-
-            self.ydl_opts.setdefault('outtmpl', os.path.join(self.out_dir, '%(title)s.%(ext)s'))
-            self.ydl_opts['progress_hooks'] = [progress_hook]
-            # Better logging into our console
-            class YDLLogger:
-                def __init__(self, signals):
-                    # store reference to Signals instance so logger methods can emit to GUI
-                    self.signals = signals
-
-                def debug(self, msg):
-                    # yt_dlp prints a lot of debug, ignore most
-                    pass
-
-                def info(self, msg):
-                    try:
-                        self.signals.append_console.emit(f"[yt-dlp] {msg}")
-                    except Exception:
-                        pass
-
-                def warning(self, msg):
-                    try:
-                        self.signals.append_console.emit(f"[WARNING] {msg}")
-                    except Exception:
-                        pass
-
-                def error(self, msg):
-                    try:
-                        self.signals.append_console.emit(f"[ERROR] {msg}")
-                    except Exception:
-                        pass
-
-            # attach logger instance that has access to our signals
-            self.ydl_opts.setdefault('logger', YDLLogger(self.signals))
+            if self.stop_event.is_set():
+                self.signals.item_update.emit(self.url, -1, 'stopped', '')
+                return
+            # per-url options on top of the shared ones
+            ydl_opts = {**self.ydl_opts, 'progress_hooks': [self._progress_hook]}
 
             # perform download
             self.signals.append_console.emit(f"Starting download: {self.url}")
             if YoutubeDL is None:
                 self.signals.append_console.emit("yt-dlp is not available. Skipping.")
-                self.signals.item_status.emit(self.url, 'missing yt-dlp')
+                self.signals.item_update.emit(self.url, -1, 'missing yt-dlp', '')
                 return
 
-            with YoutubeDL(self.ydl_opts) as ydl:
+            with YoutubeDL(ydl_opts) as ydl:
                 result = ydl.download([self.url])
                 # Note: progress hook will catch finished filename
-                self.signals.item_status.emit(self.url, 'done')
+                self.signals.item_update.emit(self.url, -1, 'done', '')
 
+        except KeyboardInterrupt:
+            self.signals.append_console.emit(f"Download stopped: {self.url}")
+            self.signals.item_update.emit(self.url, -1, 'stopped', '')
         except Exception as e:
-            tb = traceback.format_exc()
-            self.signals.append_console.emit(f"Error downloading {self.url}: {e}\n{tb}")
-            self.signals.item_status.emit(self.url, 'error')
+            log.exception("Error downloading %s", self.url)
+            self.signals.append_console.emit(f"Error downloading {self.url}: {type(e).__name__}: {e}")
+            self.signals.item_update.emit(self.url, -1, 'error', '')
+        finally:
+            # lets the window submit the next queued url
+            self.signals.worker_done.emit(self.url, self.run_id)
+
+
+class ProcessDownloadWorker(QObject):
+    """Downloads a single URL in a separate `python -m yt_dlp` process (no GIL sharing with the GUI)
+
+    Lives in the GUI thread: QProcess reports output asynchronously, so nothing here blocks.
+    """
+
+    done = pyqtSignal(str)  # url, emitted when the process has exited
+
+    PROGRESS_PREFIX = 'PROGRESS '
+    FILEPATH_PREFIX = 'FILEPATH '
+
+    def __init__(self, url: str, outtmpl: str, signals: Signals, parent=None):
+        super().__init__(parent)
+        self.url = url
+        self.outtmpl = outtmpl
+        self.signals = signals
+        self._last_pct = -1
+        self._filepath = ''
+        self._killed = False  # set by kill(): the exit is a user stop, not an error
+        self._buf = b''
+        self.proc = QProcess(self)
+        self.proc.setProcessChannelMode(QProcess.MergedChannels)
+        # child stdout follows the locale (cp1251 on Russian Windows); force UTF-8 so Cyrillic titles survive
+        env = QProcessEnvironment.systemEnvironment()
+        env.insert('PYTHONIOENCODING', 'utf-8')
+        self.proc.setProcessEnvironment(env)
+        self.proc.readyReadStandardOutput.connect(self._on_output)
+        self.proc.finished.connect(self._on_finished)
+
+    def start(self):
+        self.signals.append_console.emit(f"Starting download (process): {self.url}")
+        args = [
+            '-m', 'yt_dlp',
+            '--newline',
+            '--progress',
+            '--progress-template',
+            'download:' + self.PROGRESS_PREFIX
+            + '%(progress.downloaded_bytes)s/%(progress.total_bytes,progress.total_bytes_estimate)s',
+            '--print', 'after_move:' + self.FILEPATH_PREFIX + '%(filepath)s',
+            '-f', 'best',
+            '-o', self.outtmpl,
+            self.url,
+        ]
+        self.proc.start(sys.executable, args)
+
+    def kill(self):
+        if self.proc.state() != QProcess.NotRunning:
+            self._killed = True
+            self.proc.kill()
+
+    def _on_output(self):
+        self._buf += self.proc.readAllStandardOutput().data()
+        *lines, self._buf = self._buf.split(b'\n')
+        for raw in lines:
+            line = raw.decode('utf-8', errors='ignore').strip()
+            if not line:
+                continue
+            if line.startswith(self.PROGRESS_PREFIX):
+                self._on_progress_line(line[len(self.PROGRESS_PREFIX):])
+            elif line.startswith(self.FILEPATH_PREFIX):
+                self._filepath = line[len(self.FILEPATH_PREFIX):]
+            else:
+                self.signals.append_console.emit(f"[yt-dlp] {line}")
+
+    def _on_progress_line(self, text: str):
+        downloaded, _, total = text.partition('/')
+        try:
+            percent = int(float(downloaded) / float(total) * 100)
+        except (ValueError, ZeroDivisionError):
+            return
+        if percent != self._last_pct:
+            self._last_pct = percent
+            self.signals.item_update.emit(self.url, percent, '', '')
+
+    def _on_finished(self, exit_code, exit_status):
+        if self._killed:
+            self.signals.append_console.emit(f"Download stopped: {self.url}")
+            self.signals.item_update.emit(self.url, -1, 'stopped', '')
+        elif exit_status == QProcess.NormalExit and exit_code == 0:
+            self.signals.append_console.emit(f"[{self.url}] finished -> {self._filepath}")
+            self.signals.item_update.emit(self.url, 100, 'completed', self._filepath)
+            self.signals.item_update.emit(self.url, -1, 'done', '')
+        else:
+            self.signals.append_console.emit(f"Error downloading {self.url}: yt-dlp exited with code {exit_code}")
+            self.signals.item_update.emit(self.url, -1, 'error', '')
+        self.done.emit(self.url)
 
 
 class MainWindow(QMainWindow):
@@ -172,24 +441,65 @@ class MainWindow(QMainWindow):
         super().__init__()
         self.setWindowTitle(APP_NAME)
         self.resize(1000, 700)
-        self.download_dir = os.path.abspath('downloads')
-        os.makedirs(self.download_dir, exist_ok=True)
+        # no filesystem access before first paint: the folder is created in _deferred_init
+        self.download_dir = str(Path('downloads').absolute())
+        self._outtmpl = os.path.join(self.download_dir, '%(title)s.%(ext)s')
 
         self.threadpool = QThreadPool.globalInstance()
+        # short GUI jobs (link extraction, file deletion) get their own pool so they never wait behind downloads
+        self._jobs_pool = QThreadPool(self)
+        self._jobs_pool.setMaxThreadCount(2)
+        # set by "Stop": queued workers skip, running ones abort from the progress hook.
+        # Each start gets a new event and run id, so workers of a stopped run stay stopped
+        self._stop_event = threading.Event()
+        self._run_id = 0
         self.signals = Signals()
-        self.signals.append_console.connect(self._append_console)
-        self.signals.item_progress.connect(self._on_item_progress)
-        self.signals.item_status.connect(self._on_item_status)
-        self.signals.item_finished.connect(self._on_item_finished)
-        self.signals.enable_ui.connect(self._set_ui_enabled)
+        # one yt-dlp logger shared by all download workers
+        self._ydl_logger = YDLLogger(self.signals)
+        # Emitted from worker threads: connect as queued explicitly instead of relying on AutoConnection
+        self.signals.append_console.connect(self._append_console, Qt.QueuedConnection)
+        self.signals.item_update.connect(self._on_item_update, Qt.QueuedConnection)
+        self.signals.enable_ui.connect(self._set_ui_enabled, Qt.QueuedConnection)
+        self.signals.links_extracted.connect(self._on_links_extracted, Qt.QueuedConnection)
+        self.signals.files_deleted.connect(self._on_files_deleted, Qt.QueuedConnection)
+        self.signals.worker_done.connect(self._on_worker_done, Qt.QueuedConnection)
 
         # Keep track of queued urls and downloaded files
         self.queued_urls = []
+        self._queued_set = set()  # same urls as queued_urls, for O(1) membership checks
+        self._url_to_item = {}  # url -> QListWidgetItem, avoids scanning the list per signal
         self.downloaded_files = []
         self.running_count = 0
+        # threaded mode: urls not yet handed to the threadpool and options shared by their workers
+        self._pending_iter = iter(())
+        self._base_opts = {}
+        # subprocess mode: urls waiting for a free slot and running yt-dlp processes
+        self._proc_pending = []
+        self._proc_workers = []
+        self._proc_max = 0
+        self._current_theme = None
 
         self._build_ui()
+        self.threadpool.setMaxThreadCount(self.threads_spin.value())
+        self.threads_spin.valueChanged.connect(self.threadpool.setMaxThreadCount)
+
+        # Buffered console output, flushed by timer to avoid a re-layout per message
+        self._console_buf = []
+        self._console_timer = QTimer(self)
+        self._console_timer.setSingleShot(False)
+        self._console_timer.setInterval(CONSOLE_FLUSH_MS)
+        self._console_timer.timeout.connect(self._flush_console)
+        self._console_timer.start()
+
         self._apply_theme('Dark')
+        # runs once the event loop starts, i.e. after the window is shown
+        QTimer.singleShot(0, self._deferred_init)
+
+    def _deferred_init(self):
+        try:
+            os.makedirs(self.download_dir, exist_ok=True)
+        except OSError as e:
+            self.signals.append_console.emit(f'Не удалось создать папку {self.download_dir}: {e}')
         self._refresh_yt_dlp_state()
 
     def _build_ui(self):
@@ -257,6 +567,12 @@ class MainWindow(QMainWindow):
         opts_layout.addWidget(self.dir_btn)
         left_layout.addLayout(opts_layout)
 
+        self.subprocess_cb = QCheckBox('Режим процессов (отдельный yt-dlp на каждую загрузку)')
+        if not SUBPROCESS_MODE_AVAILABLE:
+            self.subprocess_cb.setEnabled(False)
+            self.subprocess_cb.setToolTip('Недоступно в скомпилированной версии')
+        left_layout.addWidget(self.subprocess_cb)
+
         # Buttons: Start, Stop, Reset
         ops = QHBoxLayout()
         self.start_btn = QPushButton('Старт')
@@ -305,6 +621,7 @@ class MainWindow(QMainWindow):
 
         right_layout.addWidget(QLabel('Очередь загрузок:'))
         self.queue_list = QListWidget()
+        self.queue_list.setItemDelegate(QueueItemDelegate(self.queue_list))
         right_layout.addWidget(self.queue_list)
 
         qops = QHBoxLayout()
@@ -313,13 +630,14 @@ class MainWindow(QMainWindow):
         qops.addWidget(self.remove_btn)
 
         self.clear_console_btn = QPushButton('Очистить консоль')
-        self.clear_console_btn.clicked.connect(lambda: self.console.clear())
+        self.clear_console_btn.clicked.connect(self._clear_console)
         qops.addWidget(self.clear_console_btn)
         right_layout.addLayout(qops)
 
         right_layout.addWidget(QLabel('Консоль:'))
-        self.console = QTextEdit()
+        self.console = QPlainTextEdit()
         self.console.setReadOnly(True)
+        self.console.setMaximumBlockCount(CONSOLE_MAX_LINES)
         self.console.setFixedHeight(220)
         right_layout.addWidget(self.console)
 
@@ -363,7 +681,16 @@ class MainWindow(QMainWindow):
 
     def extract_links(self):
         text = self.rich_input.toPlainText()
-        links = self._extract_urls(text)
+        if len(text) > EXTRACT_ASYNC_THRESHOLD:
+            # big rich-text paste: scan in the jobs pool, result comes back via links_extracted
+            self.extract_btn.setEnabled(False)
+            self.signals.append_console.emit(f'Поиск ссылок в тексте ({len(text)} символов)...')
+            self._jobs_pool.start(ExtractWorker(text, self.signals))
+            return
+        self._on_links_extracted(self._extract_urls(text))
+
+    def _on_links_extracted(self, links):
+        self.extract_btn.setEnabled(True)
         if not links:
             QMessageBox.information(self, 'Ничего не найдено', 'Не найдено ссылок rutube в тексте')
             return
@@ -375,35 +702,36 @@ class MainWindow(QMainWindow):
         Возвращает все rutube-ссылки из текста, включая длинные с параметрами.
         Убирает дубликаты, но НЕ обрезает параметры.
         """
-        urls = RUTUBE_LINK_RE.findall(text)
-        return list(dict.fromkeys(urls))  # сохраняем порядок и уникальность
+        return extract_rutube_links(text)  # сохраняем порядок и уникальность
 
 
     def _add_links(self, links):
-        added = 0
+        # set-based dedup against the queue and within the batch itself
+        new = []
         for link in links:
-            if link in self.queued_urls:
-                continue
-            item = QListWidgetItem(link)
-            item.setData(Qt.UserRole, {
-                'url': link,
-                'status': 'queued',
-                'progress': 0,
-                'filepath': ''
-            })
-            self.queue_list.addItem(item)
-            self.queued_urls.append(link)
-            added += 1
+            if link not in self._queued_set:
+                self._queued_set.add(link)
+                new.append(link)
+        # insert the whole batch with one Qt call, then fill item data
+        first_row = self.queue_list.count()
+        self.queue_list.addItems(new)
+        for row, link in enumerate(new, first_row):
+            item = self.queue_list.item(row)
+            item.setData(PROGRESS_ROLE, 0)
+            item.setData(STATUS_ROLE, 'queued')
+            self._url_to_item[link] = item
             # Лог для отладки полноты ссылок
             self.signals.append_console.emit(f"[DEBUG] Добавлена полная ссылка: {link}")
-        self.signals.append_console.emit(f'Добавлено ссылок: {added}')
+        self.queued_urls.extend(new)
+        self.signals.append_console.emit(f'Добавлено ссылок: {len(new)}')
 
 
     def remove_selected(self):
         for item in list(self.queue_list.selectedItems()):
-            data = item.data(Qt.UserRole)
-            url = data.get('url')
+            url = item.text()
             self.queued_urls.remove(url)
+            self._queued_set.discard(url)
+            self._url_to_item.pop(url, None)
             self.queue_list.takeItem(self.queue_list.row(item))
             self.signals.append_console.emit(f'Удалено из очереди: {url}')
 
@@ -411,6 +739,7 @@ class MainWindow(QMainWindow):
         d = QFileDialog.getExistingDirectory(self, 'Выбрать папку для сохранения', self.download_dir)
         if d:
             self.download_dir = d
+            self._outtmpl = os.path.join(self.download_dir, '%(title)s.%(ext)s')
             self.dir_btn.setText(self.download_dir)
 
     def start_downloads(self):
@@ -427,38 +756,94 @@ class MainWindow(QMainWindow):
         self.global_progress.setValue(0)
         self.global_progress.setMaximum(len(self.queued_urls))
         self.running_count = 0
+        self._stop_event = threading.Event()
+        self._run_id += 1
         self._submit_all(max_workers)
 
     def _submit_all(self, max_workers: int):
         # Use threadpool to run multiple DownloadWorker
         # We will not create more than max_workers at the same time
         self.signals.append_console.emit(f'Запуск скачивания {len(self.queued_urls)} файлов ({max_workers} потоков)')
-        # Launch up to max_workers tasks simultaneously using the threadpool directly
-        # We'll just submit all tasks; QThreadPool will limit concurrency by maxThreadCount
-        self.threadpool.setMaxThreadCount(max_workers)
-        for i in range(self.queue_list.count()):
-            item = self.queue_list.item(i)
-            data = item.data(Qt.UserRole)
-            url = data['url']
-            ydl_opts = {
-                'format': 'best',
-                # 'noplaylist': True,
-                'outtmpl': os.path.join(self.download_dir, '%(title)s.%(ext)s'),
-            }
-            worker = DownloadWorker(url, self.download_dir, ydl_opts, self.signals)
-            self.threadpool.start(worker)
-            self.running_count += 1
-            self._set_item_status(url, 'running')
+        if SUBPROCESS_MODE_AVAILABLE and self.subprocess_cb.isChecked():
+            self._submit_processes(max_workers)
+            return
+        # Options are the same for every url: build them once and share the dict between workers
+        self._base_opts = {
+            'format': 'best',
+            # 'noplaylist': True,
+            'outtmpl': self._outtmpl,
+            'logger': self._ydl_logger,
+        }
+        # Only max_workers tasks are in the threadpool at a time; each finished worker submits the next url,
+        # so a long queue doesn't keep hundreds of idle QRunnables alive
+        self._pending_iter = iter(list(self.queued_urls))
+        for _ in range(max_workers):
+            self._submit_next()
+
+    def _submit_next(self):
+        if self._stop_event.is_set():
+            return
+        # skip urls removed from the queue while they were waiting
+        url = next((u for u in self._pending_iter if u in self._queued_set), None)
+        if url is None:
+            return
+        worker = DownloadWorker(url, self._base_opts, self.signals, self._stop_event, self._run_id)
+        self.threadpool.start(worker)
+        self.running_count += 1
+        self._set_item_status(url, 'running')
+
+    def _on_worker_done(self, url: str, run_id: int):
+        # a worker of an earlier (stopped) run must not feed the current one
+        if run_id != self._run_id:
+            return
+        self._submit_next()
+
+    def _submit_processes(self, max_workers: int):
+        # Separate yt-dlp processes scale without GIL contention; we keep at most max_workers alive
+        self._proc_max = max_workers
+        self._proc_pending = list(self.queued_urls)
+        for _ in range(max_workers):
+            self._start_next_process()
+
+    def _start_next_process(self):
+        if len(self._proc_workers) >= self._proc_max:
+            return
+        # skip urls removed from the queue while they were waiting
+        url = None
+        while self._proc_pending:
+            candidate = self._proc_pending.pop(0)
+            if candidate in self._queued_set:
+                url = candidate
+                break
+        if url is None:
+            return
+        worker = ProcessDownloadWorker(url, self._outtmpl, self.signals, self)
+        worker.done.connect(partial(self._on_process_done, worker))
+        self._proc_workers.append(worker)
+        self.running_count += 1
+        self._set_item_status(url, 'running')
+        worker.start()
+
+    def _on_process_done(self, worker, url: str):
+        if worker in self._proc_workers:
+            self._proc_workers.remove(worker)
+        worker.deleteLater()
+        self._start_next_process()
+
+    def _kill_processes(self):
+        self._proc_pending.clear()
+        for worker in list(self._proc_workers):
+            worker.kill()
 
     def stop_downloads(self):
         # QThreadPool doesn't provide kill; this is a polite stop: set flag and rely on yt-dlp to be interruptible
-        # For now, ask user to confirm and then reset threadpool by creating a new one
         reply = QMessageBox.question(self, 'Остановить', 'Остановить все текущие загрузки? (будут прерваны)')
         if reply == QMessageBox.Yes:
-            # Recreate threadpool to stop queued tasks (running tasks won't be killed immediately)
-            self.threadpool = QThreadPool()
-            self.threadpool.setMaxThreadCount(self.threads_spin.value())
-            self.signals.append_console.emit('Загрузка остановлена пользователем (остановлены новые задания).')
+            # No new urls are submitted; running workers see the event on their next progress tick
+            self._stop_event.set()
+            self._pending_iter = iter(())
+            self._kill_processes()
+            self.signals.append_console.emit('Загрузка остановлена пользователем.')
             self.start_btn.setEnabled(True)
             self.stop_btn.setEnabled(False)
             self.install_btn.setEnabled(True)
@@ -476,21 +861,16 @@ class MainWindow(QMainWindow):
             return
         if res == QMessageBox.Yes:
             if delete_cb.isChecked():
-                # Delete recorded downloaded files
-                removed = 0
-                for f in list(self.downloaded_files):
-                    try:
-                        if os.path.isfile(f):
-                            os.remove(f)
-                            removed += 1
-                    except Exception as e:
-                        self.signals.append_console.emit(f'Ошибка при удалении {f}: {e}')
-                self.signals.append_console.emit(f'Удалено файлов: {removed}')
+                # Delete recorded downloaded files in the jobs pool, result is logged by _on_files_deleted
+                self._jobs_pool.start(DeleteWorker(list(self.downloaded_files), self.signals))
             # fall through to clear
         # Clear queue and console
         self.queue_list.clear()
         self.queued_urls.clear()
-        self.console.clear()
+        self._queued_set.clear()
+        self._proc_pending.clear()
+        self._url_to_item.clear()
+        self._clear_console()
         self.downloaded_files.clear()
         self.global_progress.setValue(0)
 
@@ -552,33 +932,42 @@ class MainWindow(QMainWindow):
 
     # ----------------- signal slots -----------------
     def _append_console(self, text: str):
-        self.console.append(text)
-
-    def _on_item_progress(self, url: str, percent: int):
-        # find list item and update its text/progress bar if any
-        for i in range(self.queue_list.count()):
-            item = self.queue_list.item(i)
-            data = item.data(Qt.UserRole)
-            if data.get('url') == url:
-                data['progress'] = percent
-                item.setData(Qt.UserRole, data)
-                item.setText(f"{url}  — {percent}%")
-                break
+        self._console_buf.append(text)
+
+    def _flush_console(self):
+        if self._console_buf:
+            # one insert per flush; keeps the user's selection and only follows the tail if already at the bottom
+            self.console.appendPlainText('\n'.join(self._console_buf))
+            self._console_buf.clear()
+
+    def _clear_console(self):
+        self._console_buf.clear()
+        self.console.clear()
+
+    def _on_item_update(self, url: str, progress: int, status: str, filepath: str):
+        if status == 'completed':
+            self._record_download(filepath)
+        # update list item progress bar if it is still in the queue;
+        # setData only repaints this row through the delegate, the text (url) never changes
+        item = self._url_to_item.get(url)
+        if item is None:
+            return
+        # progress-only ticks are dropped while nobody can see the list; the next tick after
+        # it is shown again brings the bar up to date, status changes are always applied
+        if not status and (self.isMinimized() or not self.queue_list.isVisible()):
+            return
+        if progress >= 0:
+            item.setData(PROGRESS_ROLE, progress)
+        if status:
+            item.setData(STATUS_ROLE, status)
 
     def _set_item_status(self, url: str, status: str):
-        for i in range(self.queue_list.count()):
-            item = self.queue_list.item(i)
-            data = item.data(Qt.UserRole)
-            if data.get('url') == url:
-                data['status'] = status
-                item.setData(Qt.UserRole, data)
-                item.setText(f"{url}  — {status}")
-                break
+        self._on_item_update(url, -1, status, '')
 
-    def _on_item_status(self, url: str, status: str):
-        self._set_item_status(url, status)
+    def _on_files_deleted(self, removed: int):
+        self.signals.append_console.emit(f'Удалено файлов: {removed}')
 
-    def _on_item_finished(self, url: str, filepath: str):
+    def _record_download(self, filepath: str):
         # store downloaded file path
         if filepath:
             # If yt-dlp provided temp or absolute path, try to sanitize and record
@@ -590,9 +979,7 @@ class MainWindow(QMainWindow):
                 cand = os.path.join(self.download_dir, b)
                 if os.path.isfile(cand):
                     self.downloaded_files.append(cand)
-        # update progress and global progress
-        # mark as done
-        self._set_item_status(url, 'completed')
+        # update global progress
         cur = self.global_progress.value()
         self.global_progress.setValue(min(self.global_progress.maximum(), cur + 1))
 
@@ -617,7 +1004,8 @@ class MainWindow(QMainWindow):
             "   приложение автоматически найдёт rutube-ссылки и добавит их в очередь.\n\n"
             "Доступные опции:\n"
             " - Потоки: количество параллельных загрузок.\n"
-            " - Папка: куда сохранять файлы. По умолчанию папка ./downloads.\n\n"
+            " - Папка: куда сохранять файлы. По умолчанию папка ./downloads.\n"
+            " - Режим процессов: каждая загрузка идёт в отдельном процессе yt-dlp (лучше для многих потоков).\n\n"
             "Консоль показывает ход операций и ошибки. При необходимости нажмите 'Установить yt-dlp',\n"
             "чтобы установить зависимость.\n\n"
             "Сброс: очищает очередь и консоль; при выборе опции удалит все файлы, загруженные в этой сессии.\n\n"
@@ -628,34 +1016,24 @@ class MainWindow(QMainWindow):
 
     def _apply_theme(self, name: str):
         name = name or self.theme_combo.currentText()
-        if name == 'Dark':
-            style = """
-            QWidget { background: #1e1e1e; color: #e0e0e0; }
-            QPushButton { background: #3a3a3a; border-radius: 6px; padding: 8px; }
-            QLineEdit, QPlainTextEdit, QTextEdit { background: #2b2b2b; color: #e0e0e0; }
-            QListWidget { background: #212121; }
-            QProgressBar { background: #2b2b2b; }
-            """
-        elif name == 'Light':
-            style = """
-            QWidget { background: #f7f7f7; color: #222; }
-            QPushButton { background: #e7e7e7; border-radius: 6px; padding: 8px; }
-            QLineEdit, QPlainTextEdit, QTextEdit { background: white; color: #111; }
-            QListWidget { background: white; }
-            QProgressBar { background: #f0f0f0; }
-            """
-        else:  # Blue
-            style = """
-            QWidget { background: qlineargradient(x1:0, y1:0, x2:1, y2:1, stop:0 #e6f0ff, stop:1 #eef6ff); color: #03396c; }
-            QPushButton { background: #8fbce6; border-radius: 6px; padding: 8px; }
-            QLineEdit, QPlainTextEdit, QTextEdit { background: white; color: #03396c; }
-            QListWidget { background: white; }
-            QProgressBar { background: #dfeffd; }
-            """
-        self.setStyleSheet(style)
+        if name not in _THEMES:
+            name = 'Blue'
+        # setStyleSheet re-polishes the whole widget tree, skip it if nothing changes
+        if name == self._current_theme:
+            return
+        self._current_theme = name
+        self.setStyleSheet(_THEMES[name])
+
+
+def setup_logging():
+    handler = RotatingFileHandler(LOG_FILE, maxBytes=1024 * 1024, backupCount=3, encoding='utf-8', delay=True)
+    handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(threadName)s: %(message)s'))
+    log.addHandler(handler)
+    log.setLevel(logging.INFO)
 
 
 def main():
+    setup_logging()
     app = QApplication(sys.argv)
     # Use Fusion style for consistent look across platforms
     QApplication.setStyle(QStyleFactory.create('Fusion'))